@@ -15,7 +15,9 @@ similar to how CSS styles web pages.
 
 # Import standard Python tools
 # --------------------------
-from typing import List  # Like types in TypeScript
+import asyncio  # Run things concurrently (like async/await in JS)
+import sys      # Access to stdin/stdout (like process.stdin in Node.js)
+from typing import List, Optional, TextIO  # Like types in TypeScript
 
 # Rich library for fancy terminal output
 # -----------------------------------
@@ -23,12 +25,14 @@ from rich.console import Console    # Main output tool
 from rich.table import Table       # Creates formatted tables
 from rich.prompt import Prompt     # Input with validation
 from rich.prompt import Confirm    # Yes/no questions
+from rich.style import Style       # A parsed color/style, like "cyan"
+from rich.text import Text, TextType  # Styled text (TextType: a str or Text)
 from rich import print as rprint   # Fancy print with colors
 
 # Our custom modules
 # ----------------
 from order import (
-    create_order, update_order_status,
+    Order, create_order, update_order_status, get_next_status,
     PIZZA_SIZES, AVAILABLE_TOPPINGS, ORDER_STATES
 )
 import storage
@@ -36,20 +40,125 @@ import storage
 # Create console for fancy output (shared across functions)
 console = Console()
 
+# How many orders to show per table page
+# Rendering a huge table is slow, so we only render one page at a time
+PAGE_SIZE = 50
+
+# Values that never change, built once when the program starts
+# instead of every time a menu is shown
+# list(dict) gives the keys: ['small', 'medium', 'large']
+PIZZA_SIZE_CHOICES = list(PIZZA_SIZES)
+MENU_CHOICES = ["1", "2", "3", "4", "5", "6"]
+# "\n".join(...) glues the lines together with newlines
+# Example: "- small: $10.99\n- medium: $14.99\n- large: $18.99"
+SIZE_LINES = "\n".join(f"- {size}: ${price}" for size, price in PIZZA_SIZES.items())
+
+# The whole main menu as one string, so it's printed in a single call
+# Strings next to each other inside () are joined automatically
+MENU_MARKUP = (
+    "\n[bold blue]PyPzza Order Management[/bold blue]\n"
+    "\n1. Create new order"
+    "\n2. List all orders"
+    "\n3. Update order status"
+    "\n4. View order details"
+    "\n5. Delete order"
+    "\n6. Exit"
+)
+# Turn the markup into styled Text once, so Rich doesn't have to
+# re-read the [bold blue]...[/bold blue] tags every time the menu is shown
+MENU_TEXT = Text.from_markup(MENU_MARKUP)
+
+# Orders table columns: (header, style)
+# Style("cyan") objects are ready to use, so Rich skips parsing the
+# style names every time a table is built
+ORDER_TABLE_COLUMNS = [
+    ("ID", Style(color="cyan")),
+    ("Customer", Style(color="magenta")),
+    ("Size", Style(color="blue")),
+    ("Status", Style(color="green")),
+    ("Price", Style(color="yellow")),
+]
+
+class FastInputMixin:
+    """
+    Reads prompt answers straight from stdin.
+    
+    Rich normally calls Python's input(), which flushes stdout and stderr
+    again on every call even though Rich has already written and flushed
+    the prompt. We print the prompt with Rich (so colors still work) and
+    then just read one line from stdin.
+    
+    Password prompts and custom streams use Rich's normal path.
+    """
+    @classmethod
+    def get_input(
+        cls,
+        console: Console,
+        prompt: TextType,
+        password: bool,
+        stream: Optional[TextIO] = None
+    ) -> str:
+        if password or stream is not None:
+            return super().get_input(console, prompt, password, stream=stream)
+        
+        console.print(prompt, end="")
+        line = sys.stdin.readline()
+        # readline() returns "" at end of input (Ctrl+D), where input()
+        # would raise EOFError, so we do the same
+        if not line:
+            raise EOFError
+        # Remove the trailing newline (like line.replace(/\n$/, "") in JS)
+        return line.rstrip("\n")
+
+# Prompt/Confirm with the faster input path mixed in
+class FastPrompt(FastInputMixin, Prompt):
+    pass
+
+class FastConfirm(FastInputMixin, Confirm):
+    pass
+
+async def ask(prompt: str, **kwargs) -> str:
+    """
+    Prompt.ask for use in async functions.
+    
+    Note: The prompt runs right here on the main thread, not in a worker
+    thread. That way Ctrl+C interrupts it straight away (a worker thread
+    stuck reading stdin would keep the program from exiting).
+    Background work that must overlap with typing is started *before*
+    asking, in a thread (see prefetch_orders).
+    """
+    return FastPrompt.ask(prompt, **kwargs)
+
+async def confirm(prompt: str) -> bool:
+    """
+    Confirm.ask for use in async functions (see ask() above).
+    """
+    return FastConfirm.ask(prompt)
+
+def prefetch_orders() -> asyncio.Future:
+    """
+    Starts loading orders in a worker thread and returns its future.
+    
+    We start this *before* asking the user for an order ID, so the file
+    is read while they are typing. Awaiting the future afterwards means
+    the storage cache is warm by the time we look the order up.
+    Similar to: const promise = loadOrders(); ...; await promise
+    
+    Note: run_in_executor hands the work to the thread immediately.
+    asyncio.create_task would only start once the event loop runs
+    again, which is after the (blocking) prompt has already finished.
+    """
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(None, storage.load_orders)
+
 def print_menu() -> None:
     """
     Shows the main menu options to the user.
     Uses Rich's color syntax: [color]text[/color]
     """
-    console.print("\n[bold blue]PyPzza Order Management[/bold blue]")
-    console.print("\n1. Create new order")
-    console.print("2. List all orders")
-    console.print("3. Update order status")
-    console.print("4. View order details")
-    console.print("5. Delete order")
-    console.print("6. Exit")
+    console.print(MENU_TEXT)
 
-def get_toppings() -> List[str]:
+async def get_toppings() -> List[str]:
     """
     Interactive topping selection.
     
@@ -75,13 +184,16 @@ def get_toppings() -> List[str]:
     
     # This will store our chosen toppings
     selected_toppings = []
+    # A set of the same toppings, so checking for duplicates is instant
+    # (like a JS Set alongside the array)
+    already_selected = set()
     
     while True:  # This is an infinite loop - it keeps going until we 'break'
         # Prompt.ask is a fancy input function that:
         # 1. Shows the message in a nice format
         # 2. Gets user input
         # 3. If default="", pressing Enter returns an empty string
-        topping_number = Prompt.ask(
+        topping_number = await ask(
             "\nEnter topping number (or press Enter to finish)",
             default=""
         )
@@ -101,10 +213,11 @@ def get_toppings() -> List[str]:
             if 0 <= index < len(AVAILABLE_TOPPINGS):
                 chosen_topping = AVAILABLE_TOPPINGS[index]
                 
-                # not in checks if something isn't in a list
-                # It's like: !array.includes(item) in JavaScript
-                if chosen_topping not in selected_toppings:
+                # not in checks if something isn't in a set
+                # It's like: !set.has(item) in JavaScript
+                if chosen_topping not in already_selected:
                     selected_toppings.append(chosen_topping)  # Add to end of list
+                    already_selected.add(chosen_topping)
                     rprint(f"[green]Added {chosen_topping}[/green]")
                 else:
                     rprint(f"[yellow]'{chosen_topping}' already added[/yellow]")
@@ -117,7 +230,7 @@ def get_toppings() -> List[str]:
     
     return selected_toppings
 
-def create_new_order() -> None:
+async def create_new_order() -> None:
     """
     Creates a new pizza order:
     1. Gets customer info
@@ -130,42 +243,37 @@ def create_new_order() -> None:
     console.print("\n[bold]Create New Order[/bold]")
     
     # Simple input with no validation
-    customer_name = Prompt.ask("Customer name")
+    customer_name = await ask("Customer name")
     
     console.print("\n[bold]Available sizes:[/bold]")
-    # items() gives us both keys and values from a dictionary
-    # It's like Object.entries() in JavaScript
-    # Example: for ('small', 10.99) in PIZZA_SIZES.items():
-    for size, price in PIZZA_SIZES.items():
-        # f-strings (f"...") let us put variables inside strings
-        # Example: f"small: $10.99"
-        console.print(f"- {size}: ${price}")
+    # All size lines were prepared once at startup (see SIZE_LINES)
+    console.print(SIZE_LINES)
     
     # Prompt.ask with choices ensures user can only enter valid sizes
-    # choices=list(...) converts dict_keys to a list
     # Example: choices=['small', 'medium', 'large']
-    size = Prompt.ask(
+    size = await ask(
         "Pizza size",
-        choices=list(PIZZA_SIZES.keys())
+        choices=PIZZA_SIZE_CHOICES
     )
     
-    toppings = get_toppings()
+    toppings = await get_toppings()
     
     try:
         # create_order might raise ValueError if something's invalid
         new_order = create_order(customer_name, size, toppings)
         storage.add_order(new_order)
-        rprint(f"\n[green]Order created successfully! Order ID: {new_order['id']}[/green]")
+        rprint(f"\n[green]Order created successfully! Order ID: {new_order.id}[/green]")
     except ValueError as error:
         # If create_order raised an error, show it in red
         rprint(f"\n[red]Error: {error}[/red]")
 
-def display_orders(orders: List[dict]) -> None:
+def display_orders(orders: List[Order], caption: str | None = None) -> None:
     """
     Shows orders in a formatted table.
     
     Args:
-        orders: List of order dictionaries
+        orders: List of orders (usually one page of them)
+        caption: Optional text shown under the table, like "Page 1 of 3"
     
     Note: Uses Rich's Table with colored columns
     """
@@ -173,43 +281,75 @@ def display_orders(orders: List[dict]) -> None:
         console.print("[yellow]No orders found[/yellow]")
         return
     
+    # Build all the row values first with a list comprehension
+    # Every value is already prepared on the Order, so this is just lookups
+    rows = [
+        (
+            order.id_short,  # First 8 chars of ID, like "3f2a9c1b..."
+            order.customer_name,
+            order.pizza_size,
+            order.status,
+            order.price_str  # Already formatted, like "$12.49"
+        )
+        for order in orders
+    ]
+    
     # Create a Rich table with a title
-    table = Table(title="Pizza Orders")
+    table = Table(title="Pizza Orders", caption=caption)
     
     # Add columns with different styles
-    # Each column can have its own color
-    table.add_column("ID", style="cyan")
-    table.add_column("Customer", style="magenta")
-    table.add_column("Size", style="blue")
-    table.add_column("Status", style="green")
-    table.add_column("Price", style="yellow")
-    
-    # Add each order as a row
-    for order in orders:
-        table.add_row(
-            # String slicing: [start:end]
-            # [:8] means "from start to position 8"
-            # So "123456789" becomes "12345678"
-            order["id"][:8] + "...",  # Show first 8 chars of ID
-            order["customer_name"],
-            order["pizza_size"],
-            order["status"],
-            f"${order['price']}"  # Format price with $ sign
-        )
+    # Each column can have its own color (see ORDER_TABLE_COLUMNS)
+    # A Table collects its rows inside its columns, so each table
+    # needs its own columns even though the settings never change
+    for header, style in ORDER_TABLE_COLUMNS:
+        table.add_column(header, style=style)
+    
+    # Add each row to the table
+    # *row unpacks the tuple into separate arguments
+    # Like table.addRow(...row) in JavaScript
+    for row in rows:
+        table.add_row(*row)
     
     console.print(table)
 
-def list_orders() -> None:
+async def list_orders() -> None:
     """
-    Displays all orders in the system.
-    Loads from storage and formats in a table.
+    Displays all orders in the system, one page at a time.
+    Loads only the current page from storage and formats it in a table.
     """
     console.print("\n[bold]All Orders[/bold]")
-    # Get orders from storage and display them
-    orders = storage.load_orders()
-    display_orders(orders)
+    total = await asyncio.to_thread(storage.count_orders)
+    
+    # Work out how many pages there are (rounding up)
+    # Example: 120 orders with PAGE_SIZE 50 -> 3 pages
+    total_pages = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
+    page_choices = [str(number) for number in range(1, total_pages + 1)]
+    
+    page = 1
+    while True:
+        # Get just this page of orders from storage (in a worker thread)
+        orders = await asyncio.to_thread(
+            storage.load_orders, (page - 1) * PAGE_SIZE, PAGE_SIZE
+        )
+        display_orders(orders, f"Page {page} of {total_pages} ({total} orders)")
+        
+        # Nothing else to see if everything fit on one page
+        if total_pages == 1:
+            break
+        
+        # Let the user jump to any page, or press Enter to go back
+        answer = await ask(
+            f"Page number (1-{total_pages}, or press Enter to go back)",
+            choices=page_choices,
+            show_choices=False,
+            show_default=False,
+            default=""
+        )
+        if not answer:
+            break
+        page = int(answer)
 
-def update_status() -> None:
+async def update_status() -> None:
     """
     Updates an order's status.
     
@@ -218,79 +358,100 @@ def update_status() -> None:
     
     Note: Validates current status before updating
     """
-    order_id = Prompt.ask("Enter order ID")
-    order = storage.get_order(order_id)
+    # Load orders while the user types the ID
+    prefetch = prefetch_orders()
+    order_id = await ask("Enter order ID (full or short)")
+    await prefetch
+    order = storage.find_order(order_id)
     
     if not order:
         rprint("[red]Order not found[/red]")
         return
     
-    current_status = order["status"]
-    # index() finds the position of an item in a list
-    # Example: ['a', 'b', 'c'].index('b') returns 1
-    current_idx = ORDER_STATES.index(current_status)
-    
-    # Check if we're at the last status
-    # len(list) - 1 is the last valid index
-    if current_idx == len(ORDER_STATES) - 1:
-        rprint("[yellow]Order is already in final state (DELIVERED)[/yellow]")
+    # Look up which status comes next
+    # None means either the last status or one we don't recognize
+    # (e.g. a hand-edited data file), so check which before reporting
+    next_status = get_next_status(order.status)
+    if next_status is None:
+        if order.status == ORDER_STATES[-1]:
+            rprint(f"[yellow]Order is already in final state ({order.status})[/yellow]")
+        else:
+            rprint(f"[red]Error: Unknown current status: {order.status}[/red]")
         return
     
-    # Get next status from the list
-    # list[index] gets item at position
-    next_status = ORDER_STATES[current_idx + 1]
-    
     # Ask for confirmation
-    if Confirm.ask(f"Update order status to {next_status}?"):
+    if await confirm(f"Update order status to {next_status}?"):
         try:
             updated_order = update_order_status(order, next_status)
-            storage.update_order(order_id, updated_order)
+            storage.update_order(order.id, updated_order)
             rprint(f"[green]Status updated to {next_status}[/green]")
         except ValueError as error:
             rprint(f"[red]Error: {error}[/red]")
 
-def view_order_details() -> None:
+async def view_order_details() -> None:
     """
     Shows complete details for one order.
     
     Note: Uses join() to format toppings list:
     "cheese, pepperoni, mushrooms"
     """
-    order_id = Prompt.ask("Enter order ID")
-    order = storage.get_order(order_id)
+    # Load orders while the user types the ID
+    prefetch = prefetch_orders()
+    order_id = await ask("Enter order ID (full or short)")
+    await prefetch
+    order = storage.find_order(order_id)
     
     if not order:
         rprint("[red]Order not found[/red]")
         return
     
-    console.print("\n[bold]Order Details[/bold]")
-    console.print(f"ID: {order['id']}")
-    console.print(f"Customer: {order['customer_name']}")
-    console.print(f"Size: {order['pizza_size']}")
     # join() combines list items with a separator
     # Example: ', '.join(['a', 'b', 'c']) becomes "a, b, c"
     # or 'No toppings' if the list is empty (which is False in Python)
-    console.print(f"Toppings: {', '.join(order['toppings']) or 'No toppings'}")
-    console.print(f"Status: {order['status']}")
-    console.print(f"Price: ${order['price']}")
-    console.print(f"Created: {order['created_at']}")
+    toppings = ', '.join(order.toppings) or 'No toppings'
+    
+    # Build all the lines first, then print them in one go
+    console.print(
+        "\n[bold]Order Details[/bold]\n"
+        f"ID: {order.id}\n"
+        f"Customer: {order.customer_name}\n"
+        f"Size: {order.pizza_size}\n"
+        f"Toppings: {toppings}\n"
+        f"Status: {order.status}\n"
+        f"Price: {order.price_str}\n"
+        f"Created: {order.created_at}"
+    )
 
-def delete_order_by_id() -> None:
+async def delete_order_by_id() -> None:
     """
     Removes an order from the system.
     Confirms successful deletion.
     """
-    # Get order ID from user
-    order_id = Prompt.ask("Enter order ID")
+    # Get order ID from user (loading orders in the meantime)
+    prefetch = prefetch_orders()
+    order_id = await ask("Enter order ID (full or short)")
+    await prefetch
     
     # Try to delete the order
     # delete_order returns True if successful, False if not found
-    if storage.delete_order(order_id):
+    order = storage.find_order(order_id)
+    if order and storage.delete_order(order.id):
         rprint("[green]Order deleted successfully[/green]")
     else:
         rprint("[red]Order not found[/red]")
 
-def main() -> None:
+# Which function runs for each menu option
+# Like a JS object mapping keys to functions: { "1": createNewOrder, ... }
+# Option "6" (exit) isn't here because it ends the loop instead
+MENU_ACTIONS = {
+    "1": create_new_order,
+    "2": list_orders,
+    "3": update_status,
+    "4": view_order_details,
+    "5": delete_order_by_id,
+}
+
+async def main() -> None:
     """
     Main program loop.
     
@@ -299,34 +460,40 @@ def main() -> None:
     2. Get valid choice
     3. Execute chosen action
     4. Repeat until exit
+    
+    Note: async so loading orders from disk can overlap with prompts
     """
     while True:  # Keep running until we break the loop
         # Show menu and get choice
         print_menu()
-        choice = Prompt.ask(
+        choice = await ask(
             "\nSelect an option",
             # User can only enter these numbers
-            choices=["1", "2", "3", "4", "5", "6"]
+            choices=MENU_CHOICES
         )
         
-        # Do different things based on user's choice
-        if choice == "1":
-            create_new_order()
-        elif choice == "2":
-            list_orders()
-        elif choice == "3":
-            update_status()
-        elif choice == "4":
-            view_order_details()
-        elif choice == "5":
-            delete_order_by_id()
+        # Look up the function for this choice and run it
+        # get() returns None for "6", which isn't in MENU_ACTIONS
+        action = MENU_ACTIONS.get(choice)
+        if action:
+            await action()
         else:  # choice must be "6" because of our choices parameter
             # Ask for confirmation before exiting
-            if Confirm.ask("\nAre you sure you want to exit?"):
+            if await confirm("\nAre you sure you want to exit?"):
+                # Make sure every change has been written to the file
+                storage.close()
                 console.print("[bold blue]Thank you for using PyPzza![/bold blue]")
                 break  # Exit the loop, ending the program
 
 # Program entry point check
 # Similar to checking if this is the main module
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Start an event loop and run main() until it finishes
+    # (asyncio.run would do the same, but it also replaces the Ctrl+C
+    # handler with one that waits for the current prompt to finish;
+    # with a plain loop, Ctrl+C raises KeyboardInterrupt right away)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
\ No newline at end of file
@@ -8,16 +8,22 @@ This module provides:
 - Business rules enforcement
 
 Key Components:
+- Order: The order record (a dataclass)
 - PIZZA_SIZES: Available sizes and their base prices
-- AVAILABLE_TOPPINGS: List of allowed toppings
+- AVAILABLE_TOPPINGS: Tuple of allowed toppings
 - ORDER_STATES: Valid order status progression
 """
+# dataclass generates __init__ and friends for simple record classes
+# (like a TypeScript interface that is also a class)
+from dataclasses import dataclass, field
 # datetime for working with dates (like Date in JS)
 from datetime import datetime
-# uuid for generating unique IDs (like crypto.randomUUID() in JS)
-import uuid
+# secrets for generating random IDs (like crypto.getRandomValues() in JS)
+import secrets
+# sys.intern lets equal strings share one object in memory
+import sys
 # Type hints (like TypeScript types)
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Tuple
 
 # Dictionary (like object literal in JS)
 # const PIZZA_SIZES = {
@@ -31,96 +37,379 @@ PIZZA_SIZES = {
     "large": 18.99
 }
 
-# List (like array in JS)
-# const AVAILABLE_TOPPINGS = [
+# Tuple (like a frozen array in JS)
+# const AVAILABLE_TOPPINGS = Object.freeze([
 #   'cheese', 'pepperoni', ...
-# ];
-AVAILABLE_TOPPINGS = [
+# ]);
+# A tuple keeps the menu order but can't be changed by accident
+AVAILABLE_TOPPINGS = (
     "cheese", "pepperoni", "mushrooms", "onions",
     "sausage", "bacon", "green_peppers", "olives"
-]
+)
+
+# frozenset is an unchangeable set (like Object.freeze(new Set(...)) in JS)
+# Checking "x in set" is instant, while "x in tuple" checks every item
+_AVAILABLE_TOPPINGS_SET = frozenset(AVAILABLE_TOPPINGS)
+
+# The topping check as a ready-made function, looked up once here:
+# _are_toppings_valid(["cheese", "ham"]) -> False
+# (The size check stays "size in PIZZA_SIZES": the 'in' operator is
+# already quicker than calling PIZZA_SIZES.__contains__)
+_are_toppings_valid = _AVAILABLE_TOPPINGS_SET.issuperset
+
+# Names for error messages, built once instead of on every call
+_PIZZA_SIZES_KEYS_MSG = str(list(PIZZA_SIZES))
+_AVAILABLE_TOPPINGS_MSG = str(list(AVAILABLE_TOPPINGS))
 
 # Constant (like const in JS)
 TOPPING_PRICE = 1.50
 
-# List of valid states in order (like enum in TypeScript)
+# The same prices in whole cents (10.99 -> 1099)
+# Floats can't store most decimals exactly (0.1 + 0.2 == 0.30000000000000004),
+# so prices are added up as integers and only turned into dollars for display.
+# round() is only needed here, once, to turn 1098.9999... into 1099
+_BASE_CENTS = {size: round(base_price * 100) for size, base_price in PIZZA_SIZES.items()}
+_TOPPING_CENTS = round(TOPPING_PRICE * 100)
+
+# Tuple of valid states in order (like enum in TypeScript)
 # Must progress through these states in sequence
-ORDER_STATES = ["PENDING", "PREPARING", "READY", "DELIVERED"]
+ORDER_STATES = ("PENDING", "PREPARING", "READY", "DELIVERED")
+_ORDER_STATES_MSG = str(list(ORDER_STATES))
+
+# How many characters of the ID to show in tables
+# The full ID is long, so we show something like "3f2a9c1b..."
+SHORT_ID_LENGTH = 8
+
+# The whole state machine as one lookup table, built once when the module loads
+# Dictionary lookups are instant, while tuple.index() has to scan the tuple
+# zip pairs each state with the one after it, and the final state with None:
+# _NEXT_STATE = {
+#     "PENDING": "PREPARING",
+#     "PREPARING": "READY",
+#     "READY": "DELIVERED",
+#     "DELIVERED": None
+# }
+# Every valid state is a key, so "state in _NEXT_STATE" also checks validity
+_NEXT_STATE = dict(zip(ORDER_STATES, ORDER_STATES[1:] + (None,)))
+
+# The same table the other way round: which state comes right before each one
+# {"PREPARING": "PENDING", "READY": "PREPARING", "DELIVERED": "READY"}
+_PREVIOUS_STATE = dict(zip(ORDER_STATES[1:], ORDER_STATES))
+
+# slots=True stores the fields in a fixed layout instead of a per-object
+# dictionary, so each order uses less memory and attribute access is faster
+@dataclass(slots=True)
+class Order:
+    """
+    A pizza order.
+    
+    Similar to this TypeScript type:
+    type Order = { id: string; customerName: string; ... }
+    """
+    id: str
+    customer_name: str
+    pizza_size: str
+    # A tuple instead of a list: toppings don't change after ordering,
+    # and a tuple is smaller in memory (it has no spare room for growing)
+    toppings: Tuple[str, ...]
+    status: str
+    # Price in cents (1249 means $12.49), so money is never rounded wrong
+    price_cents: int
+    created_at: str
+    # Price in dollars, like 12.49 (worked out from price_cents)
+    price: float = field(init=False, repr=False, compare=False)
+    # Display version of the price, like "$12.49"
+    # init=False: it's not passed in, __post_init__ fills it in once
+    # so tables don't have to format it again on every render
+    price_str: str = field(init=False, repr=False, compare=False)
+    # Shortened ID for tables, like "3f2a9c1b..." (also built once)
+    id_short: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        # Runs right after the generated __init__
+        self.price = self.price_cents / 100
+        self.price_str = format_price(self.price)
+        # String slicing: [:8] means "from start to position 8"
+        self.id_short = self.id[:SHORT_ID_LENGTH] + "..."
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a plain dictionary for saving as JSON.
+        
+        Note: price, price_str and id_short are left out because they're
+        rebuilt on load
+        """
+        return {
+            "id": self.id,
+            "customer_name": self.customer_name,
+            "pizza_size": self.pizza_size,
+            # JSON writes tuples as arrays, just like lists
+            "toppings": self.toppings,
+            "status": self.status,
+            "price_cents": self.price_cents,
+            "created_at": self.created_at
+        }
+    
+    # classmethod: called on the class itself, like a static factory in JS
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Order":
+        """
+        Create an Order from a dictionary loaded from JSON.
+        
+        Note: Extra keys (like price_str from older files) are ignored.
+        Older files only have "price" in dollars, which is turned into cents.
+        
+        Sizes, statuses and toppings only ever have a handful of values,
+        but JSON parsing creates a new string for every order. sys.intern
+        swaps each one for a single shared copy, so thousands of orders
+        don't each keep their own "PENDING" string.
+        """
+        price_cents = data.get("price_cents")
+        if price_cents is None:
+            price_cents = round(data["price"] * 100)
+        
+        return cls(
+            id=data["id"],
+            customer_name=data["customer_name"],
+            pizza_size=sys.intern(data["pizza_size"]),
+            toppings=tuple(sys.intern(topping) for topping in data["toppings"]),
+            status=sys.intern(data["status"]),
+            price_cents=price_cents,
+            created_at=data["created_at"]
+        )
 
 def validate_order_data(customer_name: str, size: str, toppings: List[str]) -> None:
     """
     Validate order data against business rules.
-    """ 
-    # strip() removes whitespace (like trim() in JS)
-    if not customer_name.strip():
-        raise ValueError("Customer name cannot be empty")
     
+    Note: Error messages are only built when a check fails, so valid
+    orders (the usual case) don't pay for them.
+    """
     # in checks key existence (like hasOwnProperty or 'in' operator in JS)
     if size not in PIZZA_SIZES:
-        raise ValueError(f"Invalid size. Choose from: {list(PIZZA_SIZES.keys())}")
+        raise ValueError(f"Invalid size. Choose from: {_PIZZA_SIZES_KEYS_MSG}")
     
-    # List comprehension to find invalid toppings
-    # Similar to Array.filter() in JS
-    invalid_toppings = [t for t in toppings if t not in AVAILABLE_TOPPINGS]
-    if invalid_toppings:
-        raise ValueError(f"Invalid toppings: {invalid_toppings}. Choose from: {AVAILABLE_TOPPINGS}")
+    # strip() removes whitespace (like trim() in JS)
+    if not customer_name.strip():
+        raise ValueError("Customer name cannot be empty")
+    
+    # issuperset checks "is every topping in the allowed set?" in one call
+    # (like toppings.every(t => allowed.has(t)) in JS), without a Python
+    # loop and without building a list when everything is valid
+    if not _are_toppings_valid(toppings):
+        # Only now collect every invalid topping for the error message
+        invalid_toppings = [t for t in toppings if t not in _AVAILABLE_TOPPINGS_SET]
+        raise ValueError(f"Invalid toppings: {invalid_toppings}. Choose from: {_AVAILABLE_TOPPINGS_MSG}")
 
-def calculate_price(size: str, toppings: List[str]) -> float:
+def calculate_price_cents(size: str, toppings: List[str]) -> int:
     """
-    Calculate total price based on size and toppings.
+    Calculate total price in cents based on size and toppings.
     """
-    base_price = PIZZA_SIZES[size]
     # len() gets length (like array.length in JS)
-    toppings_price = len(toppings) * TOPPING_PRICE
-    # round(x, 2) is like Number(x.toFixed(2)) in JS
-    return round(base_price + toppings_price, 2)
+    # Whole numbers add up exactly, so no rounding is needed
+    return _BASE_CENTS[size] + len(toppings) * _TOPPING_CENTS
+
+def calculate_price(size: str, toppings: List[str]) -> float:
+    """
+    Calculate total price in dollars based on size and toppings.
+    
+    Note: Kept for code that wants dollars; orders store price_cents
+    """
+    return calculate_price_cents(size, toppings) / 100
+
+def calculate_prices_cents(sizes: List[str], topping_counts: List[int]) -> List[int]:
+    """
+    Calculate the prices (in cents) of many pizzas at once.
+    
+    Args:
+        sizes: Pizza size of each pizza
+        topping_counts: Number of toppings of each pizza (same length as sizes)
+    
+    Returns:
+        List of prices in cents, in the same order
+    
+    Raises:
+        ValueError: If the two lists have different lengths
+    
+    Note: Like calling calculate_price_cents() for each pizza, but with one
+    function call for the whole batch and without building topping lists
+    """
+    # zip pairs up the two lists (like sizes.map((s, i) => [s, counts[i]]) in JS)
+    # strict=True raises ValueError if one list is longer, instead of
+    # quietly dropping the extra items
+    return [
+        _BASE_CENTS[size] + topping_count * _TOPPING_CENTS
+        for size, topping_count in zip(sizes, topping_counts, strict=True)
+    ]
 
-def create_order(customer_name: str, size: str, toppings: List[str]) -> Dict[str, Any]:
+def format_price(price: float) -> str:
+    """
+    Format a price for display, e.g. 12.5 -> "$12.50".
+    """
+    # :.2f always shows two decimals (like price.toFixed(2) in JS)
+    return f"${price:.2f}"
+
+# Functions used for every new order, looked up once here
+# (so Python doesn't have to find datetime.now / secrets.token_hex each time)
+# Like: const { now } = Date; in JS
+_now = datetime.now
+_token_hex = secrets.token_hex
+
+def _build_order(
+    customer_name: str,
+    size: str,
+    toppings: List[str],
+    created_at: str,
+    price_cents: int | None = None
+) -> Order:
+    """
+    Build the Order. Data must already be validated.
+    
+    Args:
+        price_cents: Price if it's already known (e.g. from
+            calculate_prices_cents), None to work it out here
+    """
+    if price_cents is None:
+        # Same as calculate_price_cents(), without the extra function call
+        price_cents = _BASE_CENTS[size] + len(toppings) * _TOPPING_CENTS
+    
+    return Order(
+        # 16 random bytes as 32 hex digits, e.g. "3f2a9c1b..."
+        # Just as unique as a UUID, but without building a UUID object first
+        id=_token_hex(16),
+        customer_name=customer_name.strip(),
+        pizza_size=size,
+        # tuple() copies the list, so later changes to it don't affect the order
+        toppings=tuple(toppings),
+        status="PENDING",
+        price_cents=price_cents,
+        created_at=created_at
+    )
+
+def _now_iso() -> str:
+    """
+    Current time as an ISO string, e.g. "2024-01-31T18:30:00".
+    """
+    # isoformat() is like toISOString() in JS
+    # timespec="seconds" drops the microseconds we never display
+    return _now().isoformat(timespec="seconds")
+
+def create_order(customer_name: str, size: str, toppings: List[str]) -> Order:
     """
     Create a new order with validated data.
     """
     validate_order_data(customer_name, size, toppings)
+    return _build_order(customer_name, size, toppings, _now_iso())
+
+def create_orders(rows: Iterable[Tuple[str, str, List[str]]]) -> List[Order]:
+    """
+    Create many orders at once (e.g. for imports or test data).
+    
+    Args:
+        rows: (customer_name, size, toppings) tuples, in a list or any
+            other iterable (like a generator)
     
-    # Dictionary (like object in JS)
-    return {
-        "id": str(uuid.uuid4()),  # Generate UUID (like crypto.randomUUID())
-        "customer_name": customer_name.strip(),
-        "pizza_size": size,
-        "toppings": toppings,
-        "status": "PENDING",
-        "price": calculate_price(size, toppings),
-        # isoformat() is like toISOString() in JS
-        "created_at": datetime.now().isoformat()
-    }
+    Note: Every row is validated before any order is built, so one bad
+    row raises ValueError and no orders are created. All orders in the
+    batch share one created_at timestamp.
+    """
+    # The rows are looped over several times below, but a generator can
+    # only be looped over once, so copy them into a list first
+    rows = list(rows)
+    
+    # Tuple unpacking: each row is split into three variables
+    # Like: for (const [name, size, toppings] of rows) in JS
+    for customer_name, size, toppings in rows:
+        validate_order_data(customer_name, size, toppings)
+    
+    # Work that's the same for every order is done once, outside the loop
+    created_at = _now_iso()
+    # All prices in one go
+    prices = calculate_prices_cents(
+        [size for _, size, _ in rows],
+        [len(toppings) for _, _, toppings in rows]
+    )
+    return [
+        _build_order(customer_name, size, toppings, created_at, price_cents)
+        for (customer_name, size, toppings), price_cents in zip(rows, prices, strict=True)
+    ]
+
+def get_next_status(current_status: str) -> str | None:
+    """
+    Get the status that comes after the current one.
+    
+    Returns None if the order is already in its final state.
+    """
+    # get() returns None when the key is missing (like obj[key] ?? null in JS)
+    return _NEXT_STATE.get(current_status)
 
 def validate_status_transition(current_status: str, new_status: str) -> None:
     """
     Validate if the status transition is allowed.
     """
-    # index() is like indexOf() in JS
-    current_idx = ORDER_STATES.index(current_status)
-    new_idx = ORDER_STATES.index(new_status)
+    # A status we don't know about (e.g. a hand-edited file) can't move anywhere
+    if current_status not in _NEXT_STATE:
+        raise ValueError(f"Unknown current status: {current_status}")
     
-    # Check if moving one step forward
-    if new_idx != current_idx + 1:
+    next_status = _NEXT_STATE[current_status]
+    
+    # Only moving one step forward is allowed
+    if next_status is None:
+        raise ValueError(f"Order is already in final state ({current_status})")
+    if new_status != next_status:
         # f-strings are like template literals in JS
         raise ValueError(
             f"Invalid status transition from {current_status} to {new_status}. "
-            f"Valid next status: {ORDER_STATES[current_idx + 1]}"
+            f"Valid next status: {next_status}"
         )
 
-def update_order_status(order: Dict[str, Any], new_status: str) -> Dict[str, Any]:
+def update_order_status(order: Order, new_status: str) -> Order:
     """
     Update order status if transition is valid.
     """
-    # Check if status is valid
-    if new_status not in ORDER_STATES:
-        raise ValueError(f"Invalid status. Choose from: {ORDER_STATES}")
+    # Check if status is valid (dictionary lookup instead of tuple scan)
+    if new_status not in _NEXT_STATE:
+        raise ValueError(f"Invalid status. Choose from: {_ORDER_STATES_MSG}")
     
     # Only validate if status is actually changing
-    if order["status"] != new_status:
-        validate_status_transition(order["status"], new_status)
-        # Update dictionary (like object property in JS)
-        order["status"] = new_status
+    if order.status != new_status:
+        validate_status_transition(order.status, new_status)
+        # Update attribute (like object property in JS)
+        order.status = new_status
+    
+    return order
+
+def update_statuses_batch(orders: List[Order], new_status: str) -> List[Order]:
+    """
+    Move many orders to the same status at once (e.g. deliver a whole batch).
+    
+    Args:
+        orders: Orders to update
+        new_status: Status to move every order to
+    
+    Returns:
+        The same orders, updated
+    
+    Note: Every order is checked before any of them is changed, so one
+    invalid transition raises ValueError and no order is updated.
+    Orders already in new_status are left as they are.
+    
+    To save the changes with a single file write:
+        with storage.batch():
+            for order in update_statuses_batch(orders, "DELIVERED"):
+                storage.update_order(order.id, order)
+    """
+    if new_status not in _NEXT_STATE:
+        raise ValueError(f"Invalid status. Choose from: {_ORDER_STATES_MSG}")
+    
+    # Only one state can move to new_status, so checking each order is a
+    # simple comparison (None for PENDING, which no state moves to)
+    previous_status = _PREVIOUS_STATE.get(new_status)
+    for order in orders:
+        if order.status != new_status and order.status != previous_status:
+            # Not allowed: this raises ValueError with the usual message
+            validate_status_transition(order.status, new_status)
     
-    return order 
\ No newline at end of file
+    for order in orders:
+        order.status = new_status
+    return orders
@@ -4,7 +4,7 @@ Storage module for PyPzza - Handles data persistence for pizza orders.
 What is this file?
 -----------------
 This module manages our order data storage. It:
-1. Saves orders to a JSON file
+1. Saves orders to a JSON Lines file
 2. Loads orders when needed
 3. Handles CRUD operations (Create, Read, Update, Delete)
 
@@ -14,21 +14,259 @@ JSON (JavaScript Object Notation) is:
 - Human-readable text format
 - Works in many programming languages
 - Built into Python (like in JavaScript)
+
+Why JSON Lines?
+--------------
+Instead of one big JSON array, the file holds one JSON object per line:
+    {"id": "3f2a...", "customer_name": "Ana", ...}
+    {"id": "9b1c...", "customer_name": "Bo", ...}
+A new order can then be added by writing one line at the end of the file,
+instead of rewriting every order that's already saved.
+
+Changes are added to the end too:
+- An updated order is written again as a new line. When the file is read,
+  a later line with the same ID replaces the earlier one.
+- A deleted order gets a short "tombstone" line: {"id": "3f2a...", "deleted": true}
+Once the file holds many more lines than orders, it is rewritten with
+only the current orders ("compacted").
 """
 
 # Standard library imports
 # ----------------------
 import json         # JSON handling (like JSON.parse/stringify)
 import os          # File operations (like fs in Node.js)
-from typing import List, Dict, Any  # Type hints (like TypeScript)
+import threading   # Locks so two threads don't touch the cache at once
+from concurrent.futures import Future, ThreadPoolExecutor  # Background work
+from contextlib import contextmanager  # Helper for writing 'with' blocks
+from functools import lru_cache  # Remembers results of function calls
+from typing import List, Dict, Any, Iterator, Set, Tuple  # Type hints (like TypeScript)
+
+# Our custom modules
+# ----------------
+from order import Order, SHORT_ID_LENGTH
+
+# Optional faster JSON library
+# --------------------------
+# orjson parses and writes JSON several times faster than the built-in json
+# module. It's not required: if it isn't installed we fall back to json.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # File path constant
 # ----------------
 # os.path.join is smart about creating paths:
-# - Windows: Uses backslashes (data\orders.json)
-# - Mac/Linux: Uses forward slashes (data/orders.json)
+# - Windows: Uses backslashes (data\orders.jsonl)
+# - Mac/Linux: Uses forward slashes (data/orders.jsonl)
 # This way our code works on any computer!
-ORDERS_FILE = os.path.join("data", "orders.json")
+ORDERS_FILE = os.path.join("data", "orders.jsonl")
+
+# Older versions saved all orders as one JSON array in orders.json.
+# If that file is found (and orders.jsonl isn't), it is converted once.
+LEGACY_ORDERS_FILE = os.path.join("data", "orders.json")
+
+# In-memory cache of the orders file
+# --------------------------------
+# Reading and parsing the whole file on every call is wasteful when
+# nothing changed. We keep the last parsed list in memory together with the
+# file's "stamp": its modification time (in nanoseconds) and its size in bytes.
+# If the file on disk still has the same stamp, the cached list is returned
+# instead of re-reading the file. Checking the size too catches changes on
+# file systems whose clocks are too coarse to give every write a new mtime.
+_orders_cache: List[Order] | None = None
+_cache_stamp: Tuple[int, int] | None = None
+
+# Lookup tables built from the cached list
+# --------------------------------------
+# Finding an order by scanning the whole list gets slower as the list grows.
+# These dictionaries let us jump straight to an order instead:
+# - _orders_by_id:     {"<full id>": order}
+# - _orders_by_prefix: {"<first 8 chars of id>": [orders with that prefix]}
+# - _order_positions:  {"<full id>": position of the order in the list}
+# The prefix table is used when the user types the short ID from the table.
+# The positions let update/delete go straight to the right list slot.
+# Changes keep these tables up to date one order at a time, so they are
+# only rebuilt from scratch when the file is (re)loaded.
+_orders_by_id: Dict[str, Order] = {}
+_orders_by_prefix: Dict[str, List[Order]] = {}
+_order_positions: Dict[str, int] = {}
+# Goes up by one whenever the lookup tables change (see _bump_generation).
+# Remembered ID lookups (see _resolve_order_id) include it, so old answers
+# are never reused.
+_cache_generation = 0
+
+# Set once ensure_storage_exists() has made sure the folder and file exist,
+# so later calls can skip asking the operating system again
+_storage_ready = False
+
+# Background writer
+# ---------------
+# Writing the whole file after every change makes the user wait before the
+# next prompt. Instead, changes update the cache right away and the file is
+# written by a single background thread (like a queue of writeFile calls).
+# One worker means writes always happen in the order they were made.
+# - _pending_writes: how many writes are queued but not finished yet.
+#   While this is above 0, the cache is newer than the file on disk.
+# - _lock: makes sure the cache/stamp are never read half-updated
+_write_executor = ThreadPoolExecutor(max_workers=1)
+_pending_writes = 0
+_lock = threading.Lock()
+
+# Batches (see batch())
+# -------------------
+# - _batch_depth: how many batch() blocks we're inside (they can be nested)
+# - _batch_dirty: True if something changed inside the batch and still
+#   needs to be written. Like _pending_writes, it means the cache is
+#   newer than the file on disk.
+# - _batch_changed_ids: IDs of orders added/updated/deleted inside the batch
+_batch_depth = 0
+_batch_dirty = False
+_batch_changed_ids: Set[str] = set()
+
+# Compaction
+# ---------
+# _log_lines counts the lines in the file (orders, old versions of updated
+# orders, and tombstones). When it grows past
+#     COMPACT_FACTOR * number of orders + COMPACT_MIN_LINES
+# the next change rewrites the file instead of adding to it.
+# COMPACT_MIN_LINES stops small files from being rewritten all the time.
+COMPACT_FACTOR = 2
+COMPACT_MIN_LINES = 100
+_log_lines = 0
+
+# Encoded lines
+# ------------
+# Rewriting the whole file (compaction, batches) would turn every order
+# into JSON again, even though most of them haven't changed since they
+# were last written. _encoded_lines remembers the exact line last written
+# for each order ID ({"<full id>": b'{"id":...}\n'}), so only changed
+# orders need to be encoded again.
+# Only the writer thread uses it (or the loader, while no writes are
+# pending), so it needs no lock. Writes tell it which IDs changed.
+_encoded_lines: Dict[str, bytes] = {}
+
+def _file_stamp() -> Tuple[int, int]:
+    """
+    Returns (modification time in ns, size in bytes) of the orders file.
+    
+    Note: os.stat is cheap compared to reading + parsing the whole file
+    """
+    info = os.stat(ORDERS_FILE)
+    return (info.st_mtime_ns, info.st_size)
+
+def _set_cache(orders: List[Order], stamp: Tuple[int, int] | None) -> None:
+    """
+    Stores orders in the cache and rebuilds the lookup tables.
+    
+    Args:
+        orders: List of orders (same as on disk)
+        stamp: _file_stamp() of the file they came from
+    """
+    global _orders_cache, _cache_stamp, _orders_by_id, _orders_by_prefix, _order_positions
+    _orders_cache = orders
+    _cache_stamp = stamp
+    _orders_by_id = {}
+    _orders_by_prefix = {}
+    _order_positions = {}
+    # Once for the whole rebuild (even when there are no orders at all)
+    _bump_generation()
+    for position, order in enumerate(orders):
+        _index_order(order, position)
+
+def _bump_generation() -> None:
+    """
+    Marks the lookup tables as changed, so remembered ID lookups
+    (see _resolve_order_id) are not reused.
+    
+    Note: Call it whenever orders are added, removed or replaced
+    """
+    global _cache_generation
+    _cache_generation += 1
+
+def _index_order(order: Order, position: int) -> None:
+    """
+    Adds one order to the lookup tables.
+    
+    Args:
+        order: Order that is stored at orders[position]
+        position: Its index in the cached list
+    
+    Note: Doesn't call _bump_generation(); callers do that once
+    """
+    _orders_by_id[order.id] = order
+    _order_positions[order.id] = position
+    # setdefault creates the empty list the first time we see a prefix
+    _orders_by_prefix.setdefault(order.id[:SHORT_ID_LENGTH], []).append(order)
+
+def _unindex_order(order: Order) -> None:
+    """
+    Removes one order from the lookup tables.
+    """
+    _bump_generation()
+    del _orders_by_id[order.id]
+    del _order_positions[order.id]
+    prefix = order.id[:SHORT_ID_LENGTH]
+    # Prefix lists are tiny (usually one order), so removing is quick
+    bucket = [other for other in _orders_by_prefix[prefix] if other is not order]
+    if bucket:
+        _orders_by_prefix[prefix] = bucket
+    else:
+        del _orders_by_prefix[prefix]
+
+def _decode(data: bytes) -> Any:
+    """
+    Turns JSON bytes into Python data, using orjson when available.
+    
+    Note: orjson.JSONDecodeError is a subclass of json.JSONDecodeError,
+    so callers only need to catch json.JSONDecodeError
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    """
+    Turns one dictionary into a JSON line (ending in a newline),
+    using orjson when available.
+    """
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    # Make the json module write the same compact output as orjson:
+    # - separators without spaces: {"a":1,"b":2} instead of {"a": 1, "b": 2}
+    # - ensure_ascii=False keeps names like "José" as they are, instead
+    #   of escaping them to "Jos\u00e9" (encode() turns them into UTF-8)
+    return (json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n").encode()
+
+def _encode_lines(orders: List[Order], changed_ids: Set[str] | None) -> bytes:
+    """
+    Encodes every order for a full rewrite, reusing remembered lines.
+    
+    Args:
+        orders: Every order, in file order
+        changed_ids: IDs whose remembered line is out of date
+            (None means don't trust any remembered line)
+    
+    Note: Runs on the writer thread. Afterwards _encoded_lines holds
+    exactly the lines that were just encoded.
+    """
+    global _encoded_lines
+    if changed_ids is None:
+        # Nothing can be trusted, so start from no remembered lines
+        old_lines = {}
+        changed_ids = set()
+    else:
+        old_lines = _encoded_lines
+    
+    new_lines = {}
+    for order in orders:
+        # get() returns None for orders we have no line for yet
+        line = None if order.id in changed_ids else old_lines.get(order.id)
+        if line is None:
+            line = _encode_record(order.to_dict())
+        new_lines[order.id] = line
+    _encoded_lines = new_lines
+    return b"".join(new_lines.values())
 
 def ensure_storage_exists() -> None:
     """
@@ -36,8 +274,18 @@ def ensure_storage_exists() -> None:
     
     Similar to:
     - mkdir -p data
-    - touch data/orders.json
+    - touch data/orders.jsonl
+    
+    Note: If only the old data/orders.json exists, its orders are
+    copied into the new file first (see _migrate_legacy_file)
+    
+    Only checks the disk on the first call; after that it returns
+    right away (the file doesn't disappear while the program runs).
     """
+    global _storage_ready
+    if _storage_ready:
+        return
+    
     # os.makedirs is like 'mkdir -p' in terminal
     # exist_ok=True means:
     # - If folder exists: do nothing
@@ -47,81 +295,460 @@ def ensure_storage_exists() -> None:
     # os.path.exists checks if a file/folder exists
     # Like fs.existsSync() in Node.js
     if not os.path.exists(ORDERS_FILE):
-        # 'with' statement is a special Python feature that:
-        # 1. Opens the file
-        # 2. Lets us work with it
-        # 3. Automatically closes it when we're done
-        # This prevents memory leaks and other problems!
-        with open(ORDERS_FILE, "w") as file:  # "w" means "write mode"
-            # json.dump converts Python data to JSON and writes it
-            # It's like JSON.stringify() + writeFileSync()
-            json.dump([], file)  # Start with empty array
+        if os.path.exists(LEGACY_ORDERS_FILE):
+            _migrate_legacy_file()
+        else:
+            _create_empty_orders_file()
+    
+    _storage_ready = True
+
+def _create_empty_orders_file() -> None:
+    """
+    Creates an empty orders file (and its folder, if missing).
+    """
+    os.makedirs("data", exist_ok=True)
+    # 'with' statement is a special Python feature that:
+    # 1. Opens the file
+    # 2. Lets us work with it
+    # 3. Automatically closes it when we're done
+    # This prevents memory leaks and other problems!
+    with open(ORDERS_FILE, "wb"):  # "wb" means "write mode, raw bytes"
+        # An empty file means "no orders yet", so nothing to write
+        pass
 
-def load_orders() -> List[Dict[str, Any]]:
+def _migrate_legacy_file() -> None:
+    """
+    Converts the old orders.json (one JSON array) into orders.jsonl.
+    
+    Note: Runs only while orders.jsonl doesn't exist yet, so the old file
+    is read once. It's left in place as a backup.
     """
-    Reads all orders from storage.
+    try:
+        with open(LEGACY_ORDERS_FILE, encoding="utf-8") as file:
+            # Like JSON.parse(text) in JavaScript
+            items = json.loads(file.read())
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        items = None
+    
+    # Only give up on the whole file if it isn't a JSON array at all
+    if not isinstance(items, list):
+        print("Warning: Invalid JSON in old orders.json file. Starting with an empty orders list.")
+        items = []
+    
+    lines = []
+    skipped = 0
+    for item in items:
+        try:
+            # JSON only knows plain dictionaries, so convert back with to_dict
+            lines.append(_encode_record(Order.from_dict(item).to_dict()))
+        except (AttributeError, KeyError, TypeError):
+            # An item that isn't an object (AttributeError) or an order
+            # with missing fields (KeyError/TypeError): skip just that one,
+            # like _read_orders_file does for bad lines
+            skipped += 1
+    
+    if skipped:
+        print(f"Warning: Skipped {skipped} unreadable order(s) in {LEGACY_ORDERS_FILE}.")
+    
+    # b"".join glues the lines together (like lines.join("") in JS)
+    _replace_orders_file(b"".join(lines))
+
+def _replace_orders_file(data: bytes) -> None:
+    """
+    Replaces the whole orders file with data, all at once.
+    
+    The data is written to a temporary file next to the real one, which is
+    then renamed over it. os.replace swaps the files in a single step, so
+    anyone reading the file sees either the old or the new version, never
+    a half-written one, even if the program crashes in the middle.
+    """
+    temp_file = ORDERS_FILE + ".tmp"
+    with open(temp_file, "wb") as file:
+        file.write(data)
+        # flush + fsync make sure the bytes are really on the disk
+        # before the rename (otherwise a power cut could lose them)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, ORDERS_FILE)
+
+def _load_cached_orders() -> List[Order]:
+    """
+    Returns the cached orders list, reading the file only if it changed.
+    
+    Note: Lines that can't be read are skipped (see _read_orders_file)
+    
+    The parsed list is cached in memory and reused until the file's
+    modification time changes, so repeated calls don't re-read the file.
+    """
+    global _log_lines
+    # 'with _lock' waits until no other thread is using the cache
+    with _lock:
+        # Writes still waiting to happen mean the cache is the newest data
+        if _orders_cache is not None and (_pending_writes or _batch_dirty):
+            return _orders_cache
+        
+        ensure_storage_exists()
+        
+        try:
+            stamp = _file_stamp()
+        except FileNotFoundError:
+            # Someone deleted the file while the program was running,
+            # so start again from an empty file
+            # (not ensure_storage_exists(): that would copy the old
+            # orders.json backup in again, bringing back stale orders)
+            _create_empty_orders_file()
+            stamp = _file_stamp()
+        
+        if _orders_cache is not None and stamp == _cache_stamp:
+            return _orders_cache
+        
+        # Note: the cache doesn't remember skipped lines, so the
+        # warning isn't repeated until the file changes
+        orders, _log_lines = _read_orders_file()
+        _set_cache(orders, stamp)
+        # The file changed behind our back, so remembered lines may be
+        # out of date (no writes are pending, so the writer isn't using them)
+        _encoded_lines.clear()
+        return orders
+
+def _read_orders_file() -> Tuple[List[Order], int]:
+    """
+    Reads and parses the orders file (no caching).
     
     Returns:
-        List of order dictionaries
+        (orders, number of lines in the file)
+    
+    Note: A line that isn't valid JSON (e.g. the program was stopped
+    halfway through writing it) only loses that one change
+    """
+    # A dictionary keeps the position where an ID was first seen, so an
+    # updated order stays in its place (like a JS Map)
+    orders_by_id: Dict[str, Order] = {}
+    line_count = 0
+    skipped = 0
+    # "rb" means "read mode, as raw bytes" (no text decoding needed)
+    with open(ORDERS_FILE, "rb") as file:
+        # Looping over a file gives one line at a time
+        for line in file:
+            # Skip blank lines
+            if not line.strip():
+                continue
+            line_count += 1
+            try:
+                # _decode is like JSON.parse(line)
+                record = _decode(line)
+                if record.get("deleted"):
+                    # Tombstone: forget the order (if we've seen it)
+                    orders_by_id.pop(record["id"], None)
+                else:
+                    # from_dict turns the plain dictionary into an Order;
+                    # a newer version replaces the older one
+                    orders_by_id[record["id"]] = Order.from_dict(record)
+            except (json.JSONDecodeError, UnicodeDecodeError, AttributeError, KeyError, TypeError):
+                # These errors happen if the JSON is invalid, a cut-off
+                # line ends halfway through a character like "é"
+                # (UnicodeDecodeError), it isn't an object (AttributeError),
+                # or an order is missing fields (KeyError/TypeError)
+                # Instead of crashing, we skip the line and warn below
+                skipped += 1
     
-    Note: Returns empty list if file is corrupted
-    Similar to: JSON.parse(readFileSync())
+    if skipped:
+        print(f"Warning: Skipped {skipped} unreadable line(s) in {ORDERS_FILE}.")
+    return list(orders_by_id.values()), line_count
+
+def load_orders(offset: int = 0, limit: int | None = None) -> List[Order]:
     """
-    ensure_storage_exists()
+    Reads orders from storage.
     
+    Args:
+        offset: How many orders to skip from the start
+        limit: Maximum number of orders to return (None means all)
+    
+    Returns:
+        A new list of Order objects (sorting or changing it doesn't
+        affect what's stored)
+    
+    Note: Use offset/limit to fetch one page at a time, e.g.
+    load_orders(offset=50, limit=50) returns the second page of 50
+    """
+    orders = _load_cached_orders()
+    # Slicing copies only the orders we asked for (all of them by default)
+    # Like orders.slice(offset, offset + limit) in JavaScript
+    # The cached list itself must never be handed out: the lookup tables
+    # remember each order's position in it
+    end = None if limit is None else offset + limit
+    return orders[offset:end]
+
+def count_orders() -> int:
+    """
+    Returns how many orders are stored.
+    
+    Note: Uses the cache, so it doesn't re-read the file
+    """
+    return len(_load_cached_orders())
+
+def save_orders(orders: List[Order]) -> None:
+    """
+    Writes orders to storage file, replacing everything in it.
+    
+    Args:
+        orders: List of Order objects
+    
+    Note: Writes one JSON object per line
+    Similar to: writeFileSync(orders.map(o => JSON.stringify(o) + "\n").join(""))
+    
+    Also refreshes the in-memory cache so the next load_orders()
+    doesn't need to read the file back.
+    Waits until the file is written (see _save_in_background for the
+    version that doesn't wait).
+    """
+    with _lock:
+        # The cache shows the new data immediately
+        # (a copy, so later changes to the caller's list don't affect it)
+        _set_cache(list(orders), _cache_stamp)
+    # .result() waits for the background write to finish
+    # Like: await writeFile(...) in JavaScript
+    _queue_save(orders).result()
+
+def _queue_save(
+    orders: List[Order],
+    append: bool = False,
+    deleted_ids: List[str] | None = None,
+    changed_ids: Set[str] | None = None
+) -> Future:
+    """
+    Queues the file write on the writer thread.
+    
+    The cache must already hold the new orders.
+    
+    Args:
+        orders: Every order (append=False), or just new/changed ones (append=True)
+        append: Add the orders to the end of the file instead of rewriting it
+        deleted_ids: IDs to write tombstones for (only used with append=True)
+        changed_ids: For full rewrites, IDs changed since they were last
+            written (None means every order may have changed)
+    
+    Returns:
+        A Future (like a JS Promise) that finishes when the file is written
+    """
+    global _pending_writes, _log_lines
+    # 'or []' turns None into an empty list (like ?? [] in JS)
+    deleted_ids = deleted_ids or []
+    with _lock:
+        _pending_writes += 1
+        if not append:
+            _log_lines = 0
+        _log_lines += len(orders) + len(deleted_ids)
+    
+    # list(orders) copies the list, so later changes to the cached list
+    # don't affect what this write puts on disk
+    return _write_executor.submit(
+        _write_orders_file, list(orders), append, deleted_ids, changed_ids
+    )
+
+def _ends_with_newline() -> bool:
+    """
+    Checks that the orders file is empty or ends with a newline.
+    """
+    with open(ORDERS_FILE, "rb") as file:
+        # seek() moves to a position and returns it; os.SEEK_END counts
+        # from the end, so this also tells us the file size
+        if file.seek(0, os.SEEK_END) == 0:
+            return True
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+def _write_orders_file(
+    orders: List[Order],
+    append: bool,
+    deleted_ids: List[str],
+    changed_ids: Set[str] | None
+) -> None:
+    """
+    Writes orders to the file. Runs on the writer thread.
+    
+    Args:
+        orders: Orders to write
+        append: Add them to the end instead of replacing the whole file
+        deleted_ids: IDs to write tombstones for
+        changed_ids: For full rewrites, IDs whose remembered line is out
+            of date (None means encode every order again)
+    """
+    global _cache_stamp, _pending_writes
+    # No lock needed while writing: load_orders() doesn't look at the
+    # file while _pending_writes is above 0
+    stamp = None
     try:
-        # "r" means "read mode"
-        with open(ORDERS_FILE, "r") as file:
-            # json.load reads JSON and converts to Python data
-            # It's like JSON.parse(fileContents)
-            return json.load(file)
-    except json.JSONDecodeError:
-        # This error happens if the JSON is invalid
-        # Instead of crashing, we:
-        # 1. Show a warning
-        # 2. Return an empty list
-        print("Warning: Invalid JSON file. Creating new empty orders list.")
-        return []
+        ensure_storage_exists()
+        
+        if append:
+            lines = []
+            for order in orders:
+                line = _encode_record(order.to_dict())
+                # Remember the newest line for compaction
+                _encoded_lines[order.id] = line
+                lines.append(line)
+            for order_id in deleted_ids:
+                _encoded_lines.pop(order_id, None)
+                lines.append(_encode_record({"id": order_id, "deleted": True}))
+            data = b"".join(lines)
+        else:
+            data = _encode_lines(orders, changed_ids)
+        # If an earlier write was cut off halfway through a line, start
+        # on a fresh line so the new orders aren't glued onto the broken one
+        if append and not _ends_with_newline():
+            data = b"\n" + data
+        
+        if append:
+            # "ab" adds to the end of the file (like fs.appendFile in Node.js)
+            with open(ORDERS_FILE, "ab") as file:
+                file.write(data)
+        else:
+            _replace_orders_file(data)
+        stamp = _file_stamp()
+    finally:
+        # 'finally' runs even if writing failed
+        with _lock:
+            # Remember the new stamp so load_orders() doesn't read it back
+            if stamp is not None:
+                _cache_stamp = stamp
+            _pending_writes -= 1
 
-def save_orders(orders: List[Dict[str, Any]]) -> None:
+def _report_write_error(future: Future) -> None:
     """
-    Writes orders to storage file.
+    Prints a warning if a background write failed.
+    """
+    error = future.exception()
+    if error is not None:
+        print(f"Warning: Could not save orders: {error}")
+
+def _save_in_background(
+    orders: List[Order],
+    append: bool = False,
+    deleted_ids: List[str] | None = None
+) -> None:
+    """
+    Saves orders without waiting for the file write to finish.
     
     Args:
-        orders: List of order dictionaries
+        orders: Every order (append=False), or just new/changed ones (append=True)
+        append: Add the orders to the end of the file instead of rewriting it
+        deleted_ids: IDs to write tombstones for (only used with append=True)
+    
+    Callers change the cached list (and its lookup tables) first, so
+    load_orders() and get_order() already see the change. Call close()
+    before exiting to make sure every write has reached the file.
+    
+    Inside a batch() block nothing is written yet: the batch writes
+    everything once when it ends.
+    
+    If the file has collected too many old lines, it is compacted:
+    rewritten with just the current orders instead of added to.
+    """
+    global _batch_dirty
+    if _batch_depth:
+        with _lock:
+            _batch_dirty = True
+        if append:
+            # Remember what changed, so the batch's rewrite can reuse
+            # the encoded lines of everything else
+            _batch_changed_ids.update(order.id for order in orders)
+            _batch_changed_ids.update(deleted_ids or [])
+        else:
+            # A full rewrite inside a batch: anything may have changed
+            _batch_changed_ids.update(order.id for order in _orders_cache)
+        return
+    
+    changed_ids = None
+    if append and _log_lines > COMPACT_FACTOR * len(_orders_cache) + COMPACT_MIN_LINES:
+        # Only the orders we were about to add need encoding again
+        changed_ids = {order.id for order in orders}
+        orders, append, deleted_ids = _orders_cache, False, None
+    
+    future = _queue_save(orders, append, deleted_ids, changed_ids)
+    # Like promise.catch(...) in JavaScript
+    future.add_done_callback(_report_write_error)
+
+# @contextmanager turns a generator function into something usable with
+# 'with': the code before 'yield' runs when the block starts, and the code
+# after it runs when the block ends
+@contextmanager
+def batch() -> Iterator[None]:
+    """
+    Groups many changes into a single file write.
+    
+    Example:
+        with storage.batch():
+            for order in orders:
+                storage.update_order(order.id, order)
     
-    Note: Creates pretty JSON with indent=2
-    Similar to: writeFileSync(JSON.stringify(orders, null, 2))
+    Note: Inside the block, add/update/delete only change the in-memory
+    cache. The whole file is rewritten once when the outermost block ends
+    (even if an error stopped the block early), instead of once per change.
+    Waits for that write to finish, like save_orders().
+    """
+    global _batch_depth, _batch_dirty
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        # 'finally' runs even if the code in the 'with' block raised an error
+        _batch_depth -= 1
+        if _batch_depth == 0 and _batch_dirty:
+            # Queue the write before clearing the flag, so load_orders()
+            # never mistakes the (still old) file for the newest data
+            future = _queue_save(_orders_cache, changed_ids=set(_batch_changed_ids))
+            with _lock:
+                _batch_dirty = False
+            _batch_changed_ids.clear()
+            future.result()
+
+def close() -> None:
     """
-    ensure_storage_exists()
+    Waits for queued writes to finish and stops the writer thread.
     
-    with open(ORDERS_FILE, "w") as file:
-        # indent=2 makes the JSON file pretty and readable:
-        # {
-        #   "key": "value",
-        #   "array": [
-        #     1,
-        #     2
-        #   ]
-        # }
-        json.dump(orders, file, indent=2)
+    Call this once when the program exits.
+    """
+    _write_executor.shutdown(wait=True)
 
-def add_order(order: Dict[str, Any]) -> None:
+def add_order(order: Order) -> None:
     """
     Adds new order to storage.
     
     Args:
-        order: Order dictionary to add
+        order: Order to add
     
     Note: Like Array.push() in JavaScript
+    Only the new order is written: it's added as one line at the end of
+    the file, so adding stays fast no matter how many orders are saved.
     """
-    orders = load_orders()
-    # append() adds item to end of list
-    # Like array.push() in JavaScript
-    orders.append(order)
-    save_orders(orders)
+    orders = _load_cached_orders()
+    with _lock:
+        # append() adds item to end of list
+        # Like array.push() in JavaScript
+        orders.append(order)
+        _index_order(order, len(orders) - 1)
+        _bump_generation()
+    _save_in_background([order], append=True)
 
-def update_order(order_id: str, updated_order: Dict[str, Any]) -> bool:
+def add_orders(new_orders: List[Order]) -> None:
+    """
+    Adds many orders to storage with a single file write.
+    
+    Args:
+        new_orders: List of orders to add
+    
+    Note: Like array.push(...items) in JavaScript
+    """
+    orders = _load_cached_orders()
+    with _lock:
+        for order in new_orders:
+            orders.append(order)
+            _index_order(order, len(orders) - 1)
+        _bump_generation()
+    _save_in_background(new_orders, append=True)
+
+def update_order(order_id: str, updated_order: Order) -> bool:
     """
     Updates existing order.
     
@@ -133,26 +760,32 @@ def update_order(order_id: str, updated_order: Dict[str, Any]) -> bool:
         True if found and updated
         False if not found
     
-    Note: Like Array.findIndex() in JavaScript
+    Note: Like array[array.findIndex(...)] = updatedOrder in JavaScript,
+    but the position comes from a lookup table instead of a search
     """
-    orders = load_orders()
+    orders = _load_cached_orders()
     
-    # enumerate gives us both position and value:
-    # for i, x in enumerate(['a', 'b']):
-    #   i will be 0, 1
-    #   x will be 'a', 'b'
-    for position, order in enumerate(orders):
-        # Check if this is the order we want
-        if order["id"] == order_id:
-            # Replace the old order with the new one
-            orders[position] = updated_order
-            save_orders(orders)
-            return True
+    with _lock:
+        position = _order_positions.get(order_id)
+        if position is None:
+            return False
+        
+        # Replace the old order with the new one, in the same place
+        _unindex_order(orders[position])
+        orders[position] = updated_order
+        _index_order(updated_order, position)
     
-    # If we get here, we didn't find the order
-    return False
+    if updated_order.id == order_id:
+        # Add the new version to the end of the file; when the file is
+        # read back it replaces the old one
+        _save_in_background([updated_order], append=True)
+    else:
+        # The ID changed, so the old line can't be matched up:
+        # rewrite the whole file instead
+        _save_in_background(orders)
+    return True
 
-def get_order(order_id: str) -> Dict[str, Any] | None:
+def get_order(order_id: str) -> Order | None:
     """
     Finds order by ID.
     
@@ -160,22 +793,84 @@ def get_order(order_id: str) -> Dict[str, Any] | None:
         order_id: ID to search for
     
     Returns:
-        Order dictionary if found
+        Order if found
         None if not found
     
-    Note: Like Array.find() in JavaScript
+    Note: Like map.get() in JavaScript
     """
-    orders = load_orders()
+    # Make sure the cache (and its lookup tables) are up to date
+    _load_cached_orders()
     
-    # Simple loop to find matching order
-    # Like array.find() in JavaScript
-    for order in orders:
-        if order["id"] == order_id:
-            return order
+    # get() returns None if the ID isn't there (None is like null in JavaScript)
+    return _orders_by_id.get(order_id)
+
+def get_order_by_prefix(prefix: str) -> Order | None:
+    """
+    Finds order by the start of its ID (like the short ID shown in tables).
+    
+    Args:
+        prefix: At least the first 8 characters of the order ID
     
-    # None is like null in JavaScript
+    Returns:
+        Order if exactly one order matches
+        None if no order matches, or the prefix is too short/ambiguous
+    """
+    if len(prefix) < SHORT_ID_LENGTH:
+        return None
+    
+    _load_cached_orders()
+    
+    # Only look at orders whose first 8 characters match
+    candidates = _orders_by_prefix.get(prefix[:SHORT_ID_LENGTH], [])
+    matches = [order for order in candidates if order.id.startswith(prefix)]
+    
+    # More than one match means we can't tell which order was meant
+    if len(matches) == 1:
+        return matches[0]
     return None
 
+# lru_cache remembers the answer for the last 128 different inputs
+# (like a memoize() helper in JS). Typing the same ID again, e.g. view an
+# order and then update it, skips the prefix search entirely.
+# The generation is part of the input, so once the orders change the old
+# answers simply stop matching (and drop out as new ones are added).
+@lru_cache(maxsize=128)
+def _resolve_order_id(id_or_prefix: str, generation: int) -> str | None:
+    """
+    Turns a full ID or a short ID into the full ID.
+    
+    Args:
+        id_or_prefix: Full order ID, or at least its first 8 characters
+        generation: _cache_generation when asked (only used by lru_cache)
+    
+    Returns:
+        The full order ID, or None if nothing (or more than one order) matches
+    """
+    if id_or_prefix in _orders_by_id:
+        return id_or_prefix
+    
+    order = get_order_by_prefix(id_or_prefix)
+    return order.id if order else None
+
+def find_order(id_or_prefix: str) -> Order | None:
+    """
+    Finds order by its full ID or by the short ID shown in tables.
+    
+    Args:
+        id_or_prefix: Full order ID, or at least its first 8 characters
+    
+    Returns:
+        Order if found
+        None if nothing (or more than one order) matches
+    """
+    # Make sure the cache (and its lookup tables) are up to date
+    _load_cached_orders()
+    
+    order_id = _resolve_order_id(id_or_prefix, _cache_generation)
+    if order_id is None:
+        return None
+    return _orders_by_id.get(order_id)
+
 def delete_order(order_id: str) -> bool:
     """
     Removes order by ID.
@@ -187,24 +882,22 @@ def delete_order(order_id: str) -> bool:
         True if found and deleted
         False if not found
     
-    Note: Uses list comprehension (like Array.filter)
+    Note: Like array.splice(index, 1) in JavaScript
     """
-    orders = load_orders()
-    # Remember initial count to check if we deleted anything
-    initial_count = len(orders)
-    
-    # This is a list comprehension - a shorter way to filter
-    # It creates a new list with only orders that DON'T match the ID
-    # Long way:
-    #   new_orders = []
-    #   for order in orders:
-    #       if order["id"] != order_id:
-    #           new_orders.append(order)
-    orders = [order for order in orders if order["id"] != order_id]
+    orders = _load_cached_orders()
     
-    # If we have fewer orders now, we found and deleted one
-    if len(orders) < initial_count:
-        save_orders(orders)
-        return True
+    with _lock:
+        position = _order_positions.get(order_id)
+        if position is None:
+            return False
+        
+        # pop(i) removes and returns the item at position i
+        _unindex_order(orders.pop(position))
+        # Every order after the deleted one moved up by one place
+        # (the list keeps its order, so tables still show oldest first)
+        for new_position in range(position, len(orders)):
+            _order_positions[orders[new_position].id] = new_position
     
-    return False 
\ No newline at end of file
+    # Add a tombstone line instead of rewriting the file
+    _save_in_background([], append=True, deleted_ids=[order_id])
+    return True 
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""
+Shared pytest setup.
+
+The app is run as `python src/main.py`, so its modules import each other
+by plain name (`import storage`). Adding src/ to the import path lets the
+tests do the same.
+"""
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
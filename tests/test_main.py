@@ -0,0 +1,64 @@
+"""
+Tests for the interactive CLI (src/main.py).
+"""
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+MAIN_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "main.py")
+
+
+def read_until(process: subprocess.Popen, text: bytes, timeout: float = 10) -> bytes:
+    """
+    Reads the process output until text shows up (or the timeout passes).
+    """
+    output = b""
+    deadline = time.monotonic() + timeout
+    while text not in output:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AssertionError(f"Timed out waiting for {text!r}, got: {output!r}")
+        ready, _, _ = select.select([process.stdout], [], [], remaining)
+        if ready:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise AssertionError(f"Process ended before {text!r}, got: {output!r}")
+            output += chunk
+    return output
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX signals")
+@pytest.mark.parametrize("keys, prompt", [
+    (b"", b"Select an option"),
+    # Option 4 starts loading orders in the background while asking for the ID
+    (b"4\n", b"Enter order ID"),
+])
+def test_ctrl_c_at_a_prompt_ends_the_program(tmp_path, keys, prompt):
+    process = subprocess.Popen(
+        [sys.executable, MAIN_FILE],
+        cwd=tmp_path,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    try:
+        process.stdin.write(keys)
+        process.stdin.flush()
+        read_until(process, prompt)
+        
+        process.send_signal(signal.SIGINT)
+        
+        # stdin stays open, so only the signal can end the program
+        process.wait(timeout=10)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    
+    assert process.returncode != 0
+    assert b"KeyboardInterrupt" in process.stdout.read()
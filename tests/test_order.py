@@ -0,0 +1,112 @@
+"""
+Tests for the order rules (src/order.py).
+"""
+import pytest
+
+import order
+from order import create_orders
+
+
+def test_create_orders_builds_every_row():
+    orders = create_orders([
+        ("Ana", "small", []),
+        ("Ben", "large", ["cheese", "olives"]),
+    ])
+
+    assert [(o.customer_name, o.price_cents) for o in orders] == [("Ana", 1099), ("Ben", 2199)]
+    # The whole batch shares one timestamp
+    assert orders[0].created_at == orders[1].created_at
+
+
+def test_create_orders_accepts_a_generator():
+    rows = ((name, "medium", ["bacon"]) for name in ["Ana", "Ben"])
+
+    assert [o.customer_name for o in create_orders(rows)] == ["Ana", "Ben"]
+
+
+def test_create_orders_is_all_or_nothing(monkeypatch):
+    built = []
+    monkeypatch.setattr(order, "_build_order", lambda *args: built.append(args))
+
+    # Only the last row is bad, but no order is built at all
+    with pytest.raises(ValueError, match="Invalid toppings"):
+        create_orders([
+            ("Ana", "small", []),
+            ("Ben", "large", ["pineapple"]),
+        ])
+    assert built == []
+
+
+def test_prices_are_in_cents():
+    assert order.calculate_price_cents("medium", ["cheese", "bacon"]) == 1799
+    assert order.calculate_prices_cents(["small", "large"], [0, 3]) == [1099, 2349]
+
+
+def test_calculate_prices_cents_needs_matching_lengths():
+    with pytest.raises(ValueError):
+        order.calculate_prices_cents(["small", "large"], [1])
+
+
+def test_from_dict_turns_old_dollar_prices_into_cents():
+    old = create_orders([("Ana", "small", ["olives"])])[0].to_dict()
+    del old["price_cents"]
+    old["price"] = 12.49
+
+    loaded = order.Order.from_dict(old)
+
+    assert loaded.price_cents == 1249
+    assert loaded.toppings == ("olives",)
+
+
+@pytest.mark.parametrize("current, new, message", [
+    ("PENDING", "PREPARING", None),
+    ("PENDING", "READY", "Invalid status transition"),
+    ("DELIVERED", "PENDING", "already in final state"),
+    ("LOST", "PENDING", "Unknown current status: LOST"),
+])
+def test_validate_status_transition(current, new, message):
+    if message is None:
+        order.validate_status_transition(current, new)
+    else:
+        with pytest.raises(ValueError, match=message):
+            order.validate_status_transition(current, new)
+
+
+def make_orders(*statuses):
+    """
+    Returns one order per status.
+    """
+    orders = create_orders([("Ana", "small", [])] * len(statuses))
+    for new_order, status in zip(orders, statuses, strict=True):
+        new_order.status = status
+    return orders
+
+
+def test_update_statuses_batch_moves_every_order():
+    orders = make_orders("READY", "DELIVERED", "READY")
+
+    # Orders already in the new status are left as they are
+    assert order.update_statuses_batch(orders, "DELIVERED") is orders
+    assert [o.status for o in orders] == ["DELIVERED"] * 3
+
+
+@pytest.mark.parametrize("statuses, new_status", [
+    # One order would skip a step
+    (("READY", "PREPARING", "READY"), "DELIVERED"),
+    # No state moves to PENDING, so only PENDING orders may stay there
+    (("PENDING", "PREPARING"), "PENDING"),
+])
+def test_update_statuses_batch_changes_nothing_if_one_is_invalid(statuses, new_status):
+    orders = make_orders(*statuses)
+
+    with pytest.raises(ValueError):
+        order.update_statuses_batch(orders, new_status)
+    assert tuple(o.status for o in orders) == statuses
+
+
+def test_update_statuses_batch_rejects_unknown_status():
+    orders = make_orders("PENDING")
+
+    with pytest.raises(ValueError, match="Invalid status"):
+        order.update_statuses_batch(orders, "LOST")
+    assert orders[0].status == "PENDING"
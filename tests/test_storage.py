@@ -0,0 +1,291 @@
+"""
+Tests for the orders file (src/storage.py).
+
+Each test runs in its own empty folder, so the real data/ folder is
+never touched.
+"""
+import dataclasses
+import json
+
+import pytest
+
+import storage
+from order import create_order, create_orders
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Runs the test in an empty folder with a fresh storage module state.
+
+    Returns:
+        Path of the data/ folder (not created yet)
+    """
+    monkeypatch.chdir(tmp_path)
+    # monkeypatch puts the old values back when the test ends
+    monkeypatch.setattr(storage, "_orders_cache", None)
+    monkeypatch.setattr(storage, "_cache_stamp", None)
+    monkeypatch.setattr(storage, "_orders_by_id", {})
+    monkeypatch.setattr(storage, "_orders_by_prefix", {})
+    monkeypatch.setattr(storage, "_order_positions", {})
+    monkeypatch.setattr(storage, "_storage_ready", False)
+    monkeypatch.setattr(storage, "_pending_writes", 0)
+    monkeypatch.setattr(storage, "_batch_depth", 0)
+    monkeypatch.setattr(storage, "_batch_dirty", False)
+    monkeypatch.setattr(storage, "_batch_changed_ids", set())
+    monkeypatch.setattr(storage, "_log_lines", 0)
+    monkeypatch.setattr(storage, "_encoded_lines", {})
+    # _cache_generation only ever goes up, so it's not reset (an old
+    # generation number could bring back another test's lookups);
+    # clearing the remembered lookups keeps them from leaking anyway
+    storage._resolve_order_id.cache_clear()
+    yield tmp_path / "data"
+    # Let background writes finish before leaving the folder
+    wait_for_writes()
+
+
+def wait_for_writes() -> None:
+    """
+    Waits until every queued background write has reached the file.
+
+    Note: storage.close() would also wait, but it stops the writer
+    thread for good, and every test shares it
+    """
+    # The writer runs one job at a time, so an empty job finishes last
+    storage._write_executor.submit(lambda: None).result()
+
+
+def read_lines(data_dir) -> list:
+    """
+    Returns the non-blank lines of the orders file.
+    """
+    return [line for line in (data_dir / "orders.jsonl").read_bytes().splitlines() if line.strip()]
+
+
+def read_back() -> list:
+    """
+    Parses the orders file from scratch (skipping the cache).
+    """
+    orders, _ = storage._read_orders_file()
+    return orders
+
+
+def test_latest_line_wins(data_dir):
+    order = create_order("Ana", "small", ["cheese"])
+    storage.add_order(order)
+    storage.update_order(order.id, dataclasses.replace(order, status="PREPARING"))
+    wait_for_writes()
+
+    # The update is added as a second line instead of rewriting the file
+    assert len(read_lines(data_dir)) == 2
+    assert [o.status for o in read_back()] == ["PREPARING"]
+
+
+def test_tombstone_removes_order(data_dir):
+    kept = create_order("Ana", "small", [])
+    removed = create_order("Ben", "large", ["olives"])
+    storage.add_orders([kept, removed])
+    assert storage.delete_order(removed.id)
+    wait_for_writes()
+
+    lines = read_lines(data_dir)
+    assert json.loads(lines[-1]) == {"id": removed.id, "deleted": True}
+    assert read_back() == [kept]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("torn_line", [
+    b'{"id": "abc", "cust',
+    # Cut off halfway through the two bytes of "é" (UTF-8 is C3 A9)
+    b'{"id":"' + b"a" * 32 + b'","customer_name":"Jos\xc3',
+])
+def test_torn_last_line_is_skipped_and_next_append_starts_fresh(
+    data_dir, capsys, monkeypatch, use_orjson, torn_line
+):
+    if not use_orjson:
+        # Same as running without orjson installed
+        monkeypatch.setattr(storage, "orjson", None)
+    first = create_order("Ana", "small", [])
+    storage.add_order(first)
+    wait_for_writes()
+    # Pretend the program was stopped halfway through writing a line
+    with open(data_dir / "orders.jsonl", "ab") as file:
+        file.write(torn_line)
+
+    assert storage.load_orders() == [first]
+    assert "Skipped 1 unreadable line" in capsys.readouterr().out
+
+    second = create_order("Ben", "medium", ["bacon"])
+    storage.add_order(second)
+    wait_for_writes()
+
+    # Only the torn line is lost; the new order got a line of its own
+    lines = read_lines(data_dir)
+    assert lines[1] == torn_line
+    assert json.loads(lines[2])["id"] == second.id
+    assert read_back() == [first, second]
+
+
+def test_compaction_shrinks_file_without_losing_updates(data_dir, monkeypatch):
+    monkeypatch.setattr(storage, "COMPACT_MIN_LINES", 4)
+    other = create_order("Ben", "large", [])
+    order = create_order("Ana", "small", [])
+    storage.add_orders([other, order])
+    for number in range(20):
+        storage.update_order(order.id, dataclasses.replace(order, customer_name=f"Ana {number}"))
+    wait_for_writes()
+
+    # Without compaction there would be 22 lines
+    limit = storage.COMPACT_FACTOR * 2 + storage.COMPACT_MIN_LINES + 1
+    assert len(read_lines(data_dir)) <= limit
+    assert [o.customer_name for o in read_back()] == ["Ben", "Ana 19"]
+
+
+def test_batch_rewrite_matches_fresh_encode(data_dir):
+    orders = [create_order(f"Customer {n}", "medium", ["mushrooms"]) for n in range(3)]
+    storage.add_orders(orders)
+    wait_for_writes()
+
+    with storage.batch():
+        storage.update_order(orders[0].id, dataclasses.replace(orders[0], status="READY"))
+        storage.delete_order(orders[1].id)
+        storage.add_order(create_order("José", "large", ["bacon", "onions"]))
+
+    # batch() waits for its write, so the file is already up to date
+    expected = read_back()
+    assert expected == storage.load_orders()
+    assert (data_dir / "orders.jsonl").read_bytes() == b"".join(
+        storage._encode_record(order.to_dict()) for order in expected
+    )
+
+
+def test_legacy_file_is_migrated(data_dir):
+    data_dir.mkdir()
+    legacy = [{
+        "id": "a" * 32,
+        "customer_name": "Ana",
+        "pizza_size": "small",
+        "toppings": ["cheese", "olives"],
+        "status": "PENDING",
+        # Old files stored the price in dollars, plus a formatted copy
+        "price": 13.99,
+        "price_str": "$13.99",
+        "created_at": "2024-01-01T12:00:00"
+    }]
+    (data_dir / "orders.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    orders = storage.load_orders()
+
+    assert [(o.id, o.price_cents, o.toppings) for o in orders] == [("a" * 32, 1399, ("cheese", "olives"))]
+    assert read_back() == orders
+    # The old file is kept as a backup
+    assert (data_dir / "orders.json").exists()
+
+
+def test_bad_legacy_orders_are_skipped_one_at_a_time(data_dir, capsys):
+    data_dir.mkdir()
+    good = [create_order("Ana", "small", []).to_dict(), create_order("Ben", "large", []).to_dict()]
+    missing_field = create_order("Cleo", "medium", []).to_dict()
+    del missing_field["created_at"]
+    legacy = [good[0], missing_field, "oops", good[1]]
+    (data_dir / "orders.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    assert [o.to_dict() for o in storage.load_orders()] == good
+    assert "Skipped 2 unreadable order(s)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("text", [
+    '[{"id": "abc"',
+    '[] trailing',
+    '{"id": "abc"}',
+])
+def test_invalid_legacy_file_starts_empty(data_dir, capsys, text):
+    data_dir.mkdir()
+    (data_dir / "orders.json").write_text(text, encoding="utf-8")
+
+    assert storage.load_orders() == []
+    assert "Invalid JSON in old orders.json" in capsys.readouterr().out
+
+
+def test_load_orders_returns_a_copy(data_dir):
+    first = create_order("Ana", "small", [])
+    second = create_order("Ben", "large", [])
+    storage.add_orders([first, second])
+
+    # Reordering the returned list must not move orders in storage
+    orders = storage.load_orders()
+    orders.reverse()
+    storage.update_order(first.id, dataclasses.replace(first, status="PREPARING"))
+
+    assert storage.get_order(second.id) == second
+    assert [o.status for o in storage.load_orders()] == ["PREPARING", "PENDING"]
+
+
+def test_short_id_follows_the_order_it_now_belongs_to(data_dir):
+    old = create_order("Ana", "small", [])
+    storage.add_order(old)
+    short_id = old.id[:8]
+    assert storage.find_order(short_id) == old
+
+    storage.delete_order(old.id)
+    assert storage.find_order(short_id) is None
+
+    # A new order whose ID happens to start the same way
+    new = dataclasses.replace(create_order("Ben", "large", []), id=short_id + "f" * 24)
+    assert new.id != old.id
+    storage.add_order(new)
+
+    assert storage.find_order(short_id) == new
+
+
+def test_reload_to_no_orders_forgets_resolved_ids(data_dir):
+    order = create_order("Ana", "small", [])
+    storage.add_order(order)
+    wait_for_writes()
+    generation = storage._cache_generation
+    assert storage.find_order(order.id[:8]) == order
+
+    # Someone empties the file while the program runs (its size changes,
+    # so the next load reads it again)
+    (data_dir / "orders.jsonl").write_bytes(b"")
+
+    assert storage.load_orders() == []
+    assert storage._cache_generation > generation
+    assert storage.find_order(order.id[:8]) is None
+
+
+def with_id(new_order, order_id):
+    """
+    Returns a copy of new_order with the given ID.
+    """
+    return dataclasses.replace(new_order, id=order_id)
+
+
+def test_find_order_by_short_id(data_dir):
+    ana = with_id(create_order("Ana", "small", []), "1234abcd" + "0" * 24)
+    ben = with_id(create_order("Ben", "large", []), "1234abcd" + "1" * 24)
+    cleo = with_id(create_order("Cleo", "medium", []), "9999ffff" + "0" * 24)
+    storage.add_orders([ana, ben, cleo])
+
+    assert storage.find_order(cleo.id) == cleo
+    assert storage.find_order("9999ffff") == cleo
+    # Too short to be a short ID
+    assert storage.find_order("9999fff") is None
+    # Two orders start with "1234abcd", so it's ambiguous...
+    assert storage.find_order("1234abcd") is None
+    assert storage.get_order_by_prefix("1234abcd") is None
+    # ...but a longer prefix tells them apart
+    assert storage.find_order("1234abcd1") == ben
+    assert storage.find_order("deadbeef") is None
+
+
+def test_load_orders_pages(data_dir):
+    orders = create_orders([(f"Customer {n}", "small", []) for n in range(5)])
+    storage.add_orders(orders)
+
+    assert storage.count_orders() == 5
+    assert storage.load_orders(limit=2) == orders[:2]
+    assert storage.load_orders(offset=2, limit=2) == orders[2:4]
+    assert storage.load_orders(offset=4, limit=2) == orders[4:]
+    assert storage.load_orders(offset=3) == orders[3:]
+    assert storage.load_orders(offset=10, limit=2) == []